@@ -0,0 +1,251 @@
+import botocore.session
+import functools
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from operator import itemgetter
+from types import MappingProxyType
+
+CACHE_DIR = os.path.expanduser("~/.cache/aws_costs")
+CURRENT_MONTH_TTL = 3600  # 1 hour while CE data is still moving
+CLOSED_MONTH_TTL = 30 * 86400  # 30 days once the month has closed
+CLOSED_MONTH_GRACE_DAYS = 5  # Late charges, credits and tax keep posting after month end
+
+# Shared by every Cost Explorer client: keep-alive avoids re-handshakes between
+# calls, the pool covers the concurrent fan-out and adaptive retries absorb throttling
+CE_CONFIG = Config(
+    region_name='us-east-1',
+    max_pool_connections=25,
+    tcp_keepalive=True,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    connect_timeout=5,
+    read_timeout=30
+)
+
+_TOTAL = itemgetter('Total')
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Account each shared client's credentials belong to (None if it couldn't be resolved),
+# so cached results can be scoped to it
+_CLIENT_ACCOUNTS = {}
+
+# ANSI color codes for highlighting
+RESET = '\033[0m'
+BOLD = '\033[1m'
+RED = '\033[91m'
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+BLUE = '\033[94m'
+MAGENTA = '\033[95m'
+CYAN = '\033[96m'
+WHITE = '\033[97m'
+BRIGHT_GREEN = '\033[92m'
+BRIGHT_RED = '\033[91m'
+BRIGHT_YELLOW = '\033[93m'
+
+# Precomputed format templates so the ANSI codes aren't re-interpolated on every call
+_CURRENCY_TEMPLATES = {
+    color: f"{color}{BOLD}${{:,.2f}}{RESET}"
+    for color in (RED, GREEN, YELLOW, BLUE,
+                  MAGENTA, CYAN, WHITE)
+}
+_PERCENTAGE_TEMPLATES = {
+    1: f"{BRIGHT_RED}{BOLD}+{{:+.2f}}%{RESET}",  # Red for increases
+    -1: f"{BRIGHT_GREEN}{BOLD}{{:+.2f}}%{RESET}",  # Green for decreases
+    0: f"{YELLOW}{BOLD}{{:+.2f}}%{RESET}",  # Yellow for no change
+}
+
+def format_currency(amount, color=None):
+    """Format currency with highlighting"""
+    if color is None:
+        color = CYAN
+    template = _CURRENCY_TEMPLATES.get(color)
+    if template is None:
+        return f"{color}{BOLD}${amount:,.2f}{RESET}"
+    return template.format(amount)
+
+def format_percentage(percentage, color=None):
+    """Format percentage with appropriate color based on value"""
+    if color is None:
+        return _PERCENTAGE_TEMPLATES[(percentage > 0) - (percentage < 0)].format(percentage)
+    
+    sign = "+" if percentage > 0 else ""
+    return f"{color}{BOLD}{sign}{percentage:+.2f}%{RESET}"
+
+@functools.lru_cache(maxsize=None)
+def get_session(profile=None):
+    """Return a shared botocore session for a profile, created once per process"""
+    return botocore.session.Session(profile=profile)
+
+@functools.lru_cache(maxsize=None)
+def get_ce_client(profile=None, region=None):
+    """Return a shared Cost Explorer client, created once per process"""
+    # region=None falls back to the region in CE_CONFIG
+    client = get_session(profile).create_client('ce', region_name=region, config=CE_CONFIG)
+    # Resolved here, on the calling thread, so the concurrent fetches never hit STS
+    try:
+        _CLIENT_ACCOUNTS[client] = get_account_id(profile)
+    except Exception:
+        _CLIENT_ACCOUNTS[client] = None  # No account, so results bypass the cache
+    return client
+
+@functools.lru_cache(maxsize=None)
+def get_account_id(profile=None):
+    """Return the AWS account ID the profile's credentials belong to"""
+    sts = get_session(profile).create_client('sts', config=CE_CONFIG)
+    return sts.get_caller_identity()['Account']
+
+def get_date_ranges():
+    return _get_date_ranges_for(date.today())
+
+@functools.lru_cache(maxsize=1)
+def _get_date_ranges_for(today):
+    """Compute the date ranges for a given day; cached so the cache rolls over at midnight
+
+    The result is shared by every caller, so it is returned read-only.
+    """
+    start_of_this_month = today.replace(day=1)
+    start_of_last_month = (start_of_this_month - timedelta(days=1)).replace(day=1)
+    end_of_last_month = start_of_this_month  # Use start of this month as exclusive end date
+
+    return MappingProxyType({
+        "current_month_to_date": (start_of_this_month.isoformat(), today.isoformat()),
+        "last_month_same_period": (start_of_last_month.isoformat(), (start_of_last_month + timedelta(days=today.day)).isoformat()),
+        "last_month_total": (start_of_last_month.isoformat(), end_of_last_month.isoformat()),
+        "current_month_forecast": (max(today, start_of_this_month).isoformat(), (start_of_this_month + timedelta(days=32)).replace(day=1).isoformat()),
+        # Union of the three cost ranges above, fetched in a single DAILY call
+        "last_month_to_date": (start_of_last_month.isoformat(), today.isoformat())
+    })
+
+def write_atomic(path, content):
+    """Write content to path via a temporary sibling so readers never see a partial file"""
+    # mkstemp gives each writer (process or thread) its own file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', buffering=1 << 16) as f:
+            f.write(content)
+        os.chmod(tmp, 0o666 & ~_UMASK)  # mkstemp creates 0600; match what open() would have given
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _fetch_results(client, start_date, end_date, granularity):
+    """Get CE ResultsByTime for a date range"""
+    # Only the one metric and no GroupBy/Filter, so each bucket carries just its total
+    response = client.get_cost_and_usage(
+        TimePeriod={"Start": start_date, "End": end_date},
+        Granularity=granularity,
+        Metrics=["UnblendedCost"]
+    )
+    return response['ResultsByTime']
+
+def get_cached_results(client, start_date, end_date, granularity):
+    """Get CE ResultsByTime for a date range, cached on disk with a staleness-aware TTL"""
+    # Skip the cache for clients that can't be tied to an account (not created by
+    # get_ce_client, or the account lookup failed)
+    account_id = _CLIENT_ACCOUNTS.get(client)
+    if account_id is None:
+        return _fetch_results(client, start_date, end_date, granularity)
+
+    # Scope the cache per account so switching credentials never serves another account's costs
+    cache_dir = os.path.join(CACHE_DIR, account_id)
+    key = hashlib.sha1(f"{start_date}|{end_date}|{granularity}".encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.json")
+    # Ranges that ended more than the grace period ago are frozen in CE, so they
+    # can be cached much longer
+    closed = end_date <= (date.today() - timedelta(days=CLOSED_MONTH_GRACE_DAYS)).isoformat()
+    ttl = CLOSED_MONTH_TTL if closed else CURRENT_MONTH_TTL
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass  # Unreadable cache entry, refetch below
+
+    results = _fetch_results(client, start_date, end_date, granularity)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(path, json.dumps(results))
+    except OSError:
+        pass  # Caching is best-effort
+    return results
+
+def get_cost_and_usage(client, start_date, end_date):
+    results = get_cached_results(client, start_date, end_date, "MONTHLY")
+    return math.fsum(float(_TOTAL(item)['UnblendedCost']['Amount']) for item in results)
+
+def get_daily_costs(client, start_date, end_date):
+    """Get daily costs for a date range as a dict of date -> cost"""
+    results = get_cached_results(client, start_date, end_date, "DAILY")
+    return {
+        date.fromisoformat(item['TimePeriod']['Start']): float(_TOTAL(item)['UnblendedCost']['Amount'])
+        for item in results
+    }
+
+def sum_daily_costs(daily_costs, start_date, end_date):
+    """Sum daily costs falling within [start_date, end_date)"""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return math.fsum(cost for day, cost in daily_costs.items() if start <= day < end)
+
+def get_forecast(client, start_date, end_date):
+    """Get the forecasted cost from start_date to the first of the following month"""
+    # PredictionIntervalLevel is left unset since only the mean is used
+    response = client.get_cost_forecast(
+        TimePeriod={"Start": start_date, "End": end_date},
+        Metric="UNBLENDED_COST",
+        Granularity="MONTHLY"
+    )
+    # The range never crosses a month boundary, so there is exactly one MONTHLY bucket
+    forecast = response['ForecastResultsByTime']
+    assert len(forecast) == 1, f"expected a single forecast bucket, got {len(forecast)}"
+    return float(forecast[0]['MeanValue'])
+
+def fetch_costs(client, date_ranges):
+    """Fetch MTD, last month same period, last month total and forecast concurrently"""
+    tasks = [
+        (get_daily_costs, date_ranges["last_month_to_date"]),
+        (get_forecast, date_ranges["current_month_forecast"]),
+    ]
+    # botocore clients are thread-safe, so a single client is shared
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(fn, client, start, end) for fn, (start, end) in tasks]
+        daily_costs, forecasted_cost = [future.result() for future in futures]
+
+    # Aggregate the daily buckets into the individual periods
+    mtd_cost = sum_daily_costs(daily_costs, *date_ranges["current_month_to_date"])
+    last_month_same_period_cost = sum_daily_costs(daily_costs, *date_ranges["last_month_same_period"])
+    last_month_total_cost = sum_daily_costs(daily_costs, *date_ranges["last_month_total"])
+    return mtd_cost, last_month_same_period_cost, last_month_total_cost, forecasted_cost
+
+def percent_change(current, previous):
+    """Percentage change from previous to current, 0 when there is no previous cost"""
+    return ((current - previous) / previous) * 100 if previous else 0
+
+def fetch_all(client=None):
+    """Fetch every summary figure with one set of CE calls, plus the derived comparisons"""
+    if client is None:
+        client = get_ce_client()
+    mtd_cost, last_month_same_period_cost, last_month_total_cost, forecasted_cost = fetch_costs(client, get_date_ranges())
+    return (
+        mtd_cost,
+        last_month_same_period_cost,
+        last_month_total_cost,
+        forecasted_cost,
+        percent_change(mtd_cost, last_month_same_period_cost),
+        percent_change(forecasted_cost, last_month_total_cost)
+    )
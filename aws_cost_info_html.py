@@ -1,102 +1,83 @@
 #!/usr/bin/env python3
-import boto3
+import hashlib
 import os
+from string import Template
 from datetime import date, timedelta, datetime
-from aws_cost_info import get_date_ranges, get_cost_and_usage, get_forecast
+from aws_cost_common import fetch_all, write_atomic
 
-def format_currency_html(amount, color=None):
-    """Format currency with HTML styling"""
-    if color is None:
-        color = "#00ffff"  # Cyan
-    return f'<span style="color: {color}; font-weight: bold;">${amount:,.2f}</span>'
-
-def format_percentage_html(percentage, color=None):
-    """Format percentage with appropriate color based on value"""
-    if color is None:
-        if percentage > 0:
-            color = "#ff5555"  # Bright red for increases
-        elif percentage < 0:
-            color = "#55ff55"  # Bright green for decreases
-        else:
-            color = "#ffff55"  # Yellow for no change
-    
-    sign = "+" if percentage > 0 else ""
-    return f'<span style="color: {color}; font-weight: bold;">{sign}{percentage:+.2f}%</span>'
-
-def generate_html(mtd_cost, last_month_same_period_cost, last_month_total_cost, 
-                  forecasted_cost, mtd_comparison, total_comparison, last_update_date):
-    """Generate HTML page with cost information"""
-    
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AWS Cost Summary</title>
-    <style>
-        * {{
+# Static stylesheet, kept out of the template so its braces need no escaping
+_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             background-color: #000000;
             color: #ffffff;
             font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', 'Consolas', 'Courier New', monospace;
             padding: 20px;
             min-height: 100vh;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 800px;
             width: 100%;
             margin: 0 auto;
             padding: 30px;
-        }}
+        }
         
-        .cost-section {{
+        .cost-section {
             margin-bottom: 25px;
             padding: 15px;
             border-left: 3px solid #5555ff;
-        }}
+        }
         
-        .cost-label {{
+        .cost-label {
             font-size: 18px;
             margin-bottom: 10px;
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
+        }
         
-        .cost-value {{
+        .cost-value {
             font-size: 28px;
             margin: 10px 0;
-        }}
+        }
         
-        .comparison {{
+        .comparison {
             margin-top: 8px;
             margin-left: 20px;
             font-size: 14px;
             color: #cccccc;
-        }}
+        }
         
-        .comparison-item {{
+        .comparison-item {
             margin: 5px 0;
-        }}
+        }
         
-        .emoji {{
+        .emoji {
             font-size: 20px;
-        }}
+        }
         
-        .update-date {{
+        .update-date {
             text-align: right;
             margin-top: 30px;
             padding-top: 15px;
             color: #666666;
             font-size: 12px;
-        }}
-    </style>
+        }
+"""
+
+_HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AWS Cost Summary</title>
+    <style>
+${css}    </style>
 </head>
 <body>
     <div class="container">
@@ -106,14 +87,14 @@ def generate_html(mtd_cost, last_month_same_period_cost, last_month_total_cost,
                 <span>Month-to-date cost:</span>
             </div>
             <div class="cost-value">
-                {format_currency_html(mtd_cost)}
+                ${mtd_cost}
             </div>
             <div class="comparison">
                 <div class="comparison-item">
-                    ↳ {format_percentage_html(mtd_comparison)} compared to last month for the same period
+                    ↳ ${mtd_comparison} compared to last month for the same period
                 </div>
                 <div class="comparison-item">
-                    ↳ Last month's cost for the same period: {format_currency_html(last_month_same_period_cost, "#ffff55")}
+                    ↳ Last month's cost for the same period: ${last_month_same_period_cost}
                 </div>
             </div>
         </div>
@@ -124,42 +105,81 @@ def generate_html(mtd_cost, last_month_same_period_cost, last_month_total_cost,
                 <span>Total forecasted cost for current month:</span>
             </div>
             <div class="cost-value">
-                {format_currency_html(forecasted_cost, "#ff55ff")}
+                ${forecasted_cost}
             </div>
             <div class="comparison">
                 <div class="comparison-item">
-                    ↳ {format_percentage_html(total_comparison)} compared to last month's total costs
+                    ↳ ${total_comparison} compared to last month's total costs
                 </div>
                 <div class="comparison-item">
-                    ↳ Last month's total cost: {format_currency_html(last_month_total_cost, "#ffff55")}
+                    ↳ Last month's total cost: ${last_month_total_cost}
                 </div>
             </div>
         </div>
         
         <div class="update-date">
-            Last updated: {last_update_date.strftime('%Y-%m-%d %H:%M:%S')}
+            Page generated: ${last_update_date}
         </div>
     </div>
 </body>
-</html>"""
+</html>""")
+
+# Changes whenever the page layout or styling does, forcing the page to be republished
+_PAGE_FINGERPRINT = hashlib.sha1((_HTML_TEMPLATE.template + _CSS).encode()).hexdigest()
+
+def format_currency_html(amount, color=None):
+    """Format currency with HTML styling"""
+    if color is None:
+        color = "#00ffff"  # Cyan
+    return f'<span style="color: {color}; font-weight: bold;">${amount:,.2f}</span>'
+
+def format_percentage_html(percentage, color=None):
+    """Format percentage with appropriate color based on value"""
+    if color is None:
+        if percentage > 0:
+            color = "#ff5555"  # Bright red for increases
+        elif percentage < 0:
+            color = "#55ff55"  # Bright green for decreases
+        else:
+            color = "#ffff55"  # Yellow for no change
     
-    return html_content
+    sign = "+" if percentage > 0 else ""
+    return f'<span style="color: {color}; font-weight: bold;">{sign}{percentage:+.2f}%</span>'
 
-def main():
-    """Generate HTML report"""
-    # Initialize Cost Explorer client
-    client = boto3.client('ce', region_name='us-east-1')
-    date_ranges = get_date_ranges()
+def generate_html(mtd_cost, last_month_same_period_cost, last_month_total_cost, 
+                  forecasted_cost, mtd_comparison, total_comparison, last_update_date):
+    """Generate HTML page with cost information"""
+    return _HTML_TEMPLATE.substitute(
+        css=_CSS,
+        mtd_cost=format_currency_html(mtd_cost),
+        mtd_comparison=format_percentage_html(mtd_comparison),
+        last_month_same_period_cost=format_currency_html(last_month_same_period_cost, "#ffff55"),
+        forecasted_cost=format_currency_html(forecasted_cost, "#ff55ff"),
+        total_comparison=format_percentage_html(total_comparison),
+        last_month_total_cost=format_currency_html(last_month_total_cost, "#ffff55"),
+        last_update_date=last_update_date.strftime('%Y-%m-%d %H:%M:%S')
+    )
 
-    # Get costs
-    mtd_cost = get_cost_and_usage(client, *date_ranges["current_month_to_date"])
-    last_month_same_period_cost = get_cost_and_usage(client, *date_ranges["last_month_same_period"])
-    last_month_total_cost = get_cost_and_usage(client, *date_ranges["last_month_total"])
-    forecasted_cost = get_forecast(client, *date_ranges["current_month_forecast"])
+def render_html(mtd_cost, last_month_same_period_cost, last_month_total_cost,
+                forecasted_cost, mtd_comparison, total_comparison):
+    """Write the HTML report to html/index.html"""
+    # Create output directory if it doesn't exist
+    output_dir = "html"
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, "index.html")
+    # Kept beside the published directory rather than inside it, so it is never served
+    digest_file = ".html_report.sha"
 
-    # Calculate percentages
-    mtd_comparison = ((mtd_cost - last_month_same_period_cost) / last_month_same_period_cost) * 100 if last_month_same_period_cost else 0
-    total_comparison = ((forecasted_cost - last_month_total_cost) / last_month_total_cost) * 100 if last_month_total_cost else 0
+    # Skip regenerating the page when neither the figures nor the page layout have
+    # changed since the last run; the page's date is when it was last generated
+    digest = hashlib.sha1(
+        f"{_PAGE_FINGERPRINT}|{mtd_cost:.2f}|{last_month_same_period_cost:.2f}|{last_month_total_cost:.2f}|{forecasted_cost:.2f}".encode()
+    ).hexdigest()
+    if os.path.exists(output_file) and os.path.exists(digest_file):
+        with open(digest_file) as f:
+            if f.read().strip() == digest:
+                print(f"HTML report unchanged: {output_file}")
+                return
 
     # Generate HTML
     last_update_date = datetime.now()
@@ -173,17 +193,17 @@ def main():
         last_update_date
     )
     
-    # Create output directory if it doesn't exist
-    output_dir = "html"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Write to file
-    output_file = os.path.join(output_dir, "index.html")
-    with open(output_file, 'w') as f:
-        f.write(html_content)
+    # Write to file, atomically so a web server never serves a truncated page
+    write_atomic(output_file, html_content)
+    write_atomic(digest_file, digest)
     
     print(f"HTML report generated: {output_file}")
 
+def main():
+    """Generate HTML report"""
+    # Get costs and comparisons
+    render_html(*fetch_all())
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+import argparse
+from aws_cost_common import fetch_all
+from aws_cost_info import render_terminal
+from aws_cost_info_html import render_html
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render the AWS cost summary from a single set of Cost Explorer calls")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--term", action="store_true", help="print the terminal summary only")
+    output.add_argument("--html", action="store_true", help="write the HTML report only")
+    output.add_argument("--both", action="store_true", help="print the terminal summary and write the HTML report (default)")
+    return parser.parse_args()
+
+def main():
+    """Fetch costs once and render the requested outputs"""
+    args = parse_args()
+    emit_term = args.term or not args.html
+    emit_html = args.html or not args.term
+
+    # Get costs and comparisons
+    costs = fetch_all()
+
+    if emit_term:
+        render_terminal(*costs)
+    if emit_html:
+        render_html(*costs)
+
+if __name__ == "__main__":
+    main()